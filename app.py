@@ -1,9 +1,12 @@
 import os
+import atexit
 import asyncio
 import logging
+import threading
 import streamlit as st
 from src.pdf_extractor import extract_text_from_pdf
 from src.document_processor import LegalDocumentProcessor
+from src.agents import aclose_http_clients, LegalAgentError
 import json
 from datetime import datetime
 from fpdf import FPDF, XPos, YPos
@@ -75,11 +78,49 @@ def get_download_filename(request_type: str, doc_name: str, ext: str = "pdf") ->
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     return f"{request_type}_{doc_name}_{timestamp}.{ext}"
 
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Start one background event loop shared by all sessions.
+
+    The agents keep pooled HTTP connections per event loop, so running every
+    request on this loop reuses them instead of reconnecting per asyncio.run.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    atexit.register(lambda: asyncio.run_coroutine_threadsafe(aclose_http_clients(), loop).result(timeout=5))
+    return loop
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+def iterate_async(parts):
+    """Consume an async iterator on the shared event loop from synchronous code"""
+    while True:
+        try:
+            yield run_async(parts.__anext__())
+        except StopAsyncIteration:
+            break
+
+def stream_to_placeholder(parts, placeholder) -> str:
+    """Render streamed text into a Streamlit placeholder and return the full text"""
+    parts = iterate_async(parts)
+    placeholder.markdown("▌")
+    # The first token can take a while for long documents or after retried rate limits
+    with st.spinner("Processing..."):
+        text = next(parts, "")
+    placeholder.markdown(text + "▌")
+    for part in parts:
+        text += part
+        placeholder.markdown(text + "▌")
+    placeholder.markdown(text)
+    return text
+
 def process_request(request_type, question=None):
     try:
         processor = LegalDocumentProcessor()
         with st.spinner("Processing..."):
-            result = asyncio.run(processor.process_document(
+            result = run_async(processor.process_document(
                 st.session_state.documents[st.session_state.current_doc]["text"], 
                 request_type,
                 question
@@ -359,21 +400,22 @@ def main():
             # Use chat helper for general questions
             processor = LegalDocumentProcessor()
             with st.chat_message("assistant"):
-                with st.spinner("Analyzing document and preparing response..."):
-                    result = asyncio.run(processor.process_document(
-                        st.session_state.documents[st.session_state.current_doc]["text"],
-                        "chat",
-                        prompt
-                    ))
-                    
-                    if "error" in result:
-                        st.error(result["error"])
-                    else:
-                        st.markdown(result["result"])
-                        st.session_state.messages.append({
-                            "role": "assistant",
-                            "content": result["result"]
-                        })
+                # Render the answer as it streams in instead of waiting for the full completion
+                placeholder = st.empty()
+                try:
+                    response = stream_to_placeholder(
+                        processor.stream_chat(
+                            st.session_state.documents[st.session_state.current_doc]["text"],
+                            prompt
+                        ),
+                        placeholder
+                    )
+                    st.session_state.messages.append({
+                        "role": "assistant",
+                        "content": response
+                    })
+                except LegalAgentError as e:
+                    placeholder.error(str(e))
 
     # Add credits at the bottom of sidebar
     st.sidebar.markdown("---")
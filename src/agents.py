@@ -1,435 +1,538 @@
+import io
 import os
+import re
+import json
+import asyncio
+import weakref
+import functools
 import logging
+import httpx
+import tiktoken
+from typing import AsyncIterator
 from dotenv import load_dotenv
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from openai import APIConnectionError, APITimeoutError, InternalServerError, LengthFinishReasonError, RateLimitError
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_community.cache import SQLiteCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableSequence
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.batch import run_batch, json_schema_response_format
+from src.schemas import SummaryOut, CaseSkeleton
+from src.prompts import (
+    SYSTEM_PROMPT,
+    PACKED_CHUNKS_INSTRUCTION,
+    SKELETON_TEMPLATE,
+    SKELETON_REDUCE_TEMPLATE,
+    SUMMARY_TEMPLATE,
+    SUMMARY_REDUCE_TEMPLATE,
+    APPEAL_TEMPLATE,
+    REVIEW_TEMPLATE,
+    REVIEW_REDUCE_TEMPLATE,
+    LAWSUIT_TEMPLATE,
+    LAWSUIT_RESPONSE_TEMPLATE,
+    CONTRACT_ANALYSIS_TEMPLATE,
+    CHAT_SYSTEM_PROMPT,
+    CHAT_TEMPLATE
+)
 
 # Load environment variables
 load_dotenv()
 
-# Get API key from environment
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY not found in environment variables")
-
-# Initialize model with environment variable
-model = ChatOpenAI(
-    model="gpt-4o-mini",  
-    openai_api_key=api_key,
-    temperature=0.7,
-    max_completion_tokens=2048
-)
-
-# Define prompt templates and message creation
-def create_messages(prompt: str, document: str):
-    return [
-        SystemMessage(content="You are a legal expert AI assistant."),
-        HumanMessage(content=prompt.format(document=document))
-    ]
-
-def chunk_document(document: str, max_length: int = 5000) -> list[str]:
-    chunks = []
-    start = 0
-    while start < len(document):
-        end = min(start + max_length, len(document))
-        chunks.append(document[start:end])
-        start = end
-    return chunks
-
-async def legal_summary_agent(document: str) -> str:
+# Chat model used by every agent
+MODEL_NAME = "gpt-4o-mini"
+
+# Cache LLM responses on disk so re-analyzing a document skips the API (empty path disables)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.db")
+
+# Upper bound on concurrent LLM requests across all agents and sessions sharing an event loop
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Transient API failures retried with jittered exponential backoff (except an exhausted
+# quota, see is_quota_exhausted), and the attempt limit
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+RETRY_ATTEMPTS = int(os.getenv("LLM_RETRY_ATTEMPTS", "5"))
+RETRY_MAX_WAIT = float(os.getenv("LLM_RETRY_MAX_WAIT", "20"))
+
+# Documents with more chunks than this go through the OpenAI Batch API (0 disables)
+BATCH_THRESHOLD = int(os.getenv("LLM_BATCH_THRESHOLD", "0"))
+
+# Token budget per chunk and the overlap carried between neighbouring chunks
+CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "8000"))
+CHUNK_OVERLAP = int(os.getenv("LLM_CHUNK_OVERLAP", "200"))
+
+# Connection pool for the shared HTTP/2 clients so concurrent requests reuse connections
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Completion caps sized to each agent's output contract; decode time grows with the cap.
+# Structured chains (summary, skeleton) also pay for JSON keys, quoting and escaping
+SUMMARY_MAX_TOKENS = 1400
+REVIEW_MAX_TOKENS = 1100
+DRAFTING_MAX_TOKENS = 2048
+SKELETON_MAX_TOKENS = 2500
+
+# Cap for the one retry of a structured chain whose JSON was cut off at its regular cap
+STRUCTURED_RETRY_MAX_TOKENS = 4096
+
+# Runs of consecutive small chunks are packed into one call of up to this many tokens,
+# with no more chunks than the completion cap can answer at this many tokens each
+PACK_TOKENS = int(os.getenv("LLM_PACK_TOKENS", str(CHUNK_TOKENS)))
+PACKED_ANSWER_TOKENS = int(os.getenv("LLM_PACKED_ANSWER_TOKENS", "350"))
+
+# Shortest repeated text treated as the splitter's overlap rather than a coincidence
+MIN_OVERLAP_CHARS = 20
+
+# Marker introducing each chunk of a packed prompt and each per-chunk answer
+CHUNK_MARKER = "=== CHUNK {index} ==="
+CHUNK_MARKER_PATTERN = re.compile(r"^\s*=== CHUNK (\d+) ===\s*$", re.MULTILINE)
+
+# Documents up to this size are sent whole in a single call instead of being chunked;
+# leaves gpt-4o-mini's 128k context room for the prompt and the largest completion cap
+SINGLE_CALL_TOKENS = int(os.getenv("LLM_SINGLE_CALL_TOKENS", "100000"))
+
+# Template, system prompt, completion cap (None keeps the model default) and
+# structured output schema (None for plain text) of every chain
+CHAIN_SPECS = {
+    "skeleton": (SKELETON_TEMPLATE, SYSTEM_PROMPT, SKELETON_MAX_TOKENS, CaseSkeleton),
+    "skeleton_reduce": (SKELETON_REDUCE_TEMPLATE, SYSTEM_PROMPT, SKELETON_MAX_TOKENS, CaseSkeleton),
+    "summary": (SUMMARY_TEMPLATE, SYSTEM_PROMPT, SUMMARY_MAX_TOKENS, SummaryOut),
+    "summary_reduce": (SUMMARY_REDUCE_TEMPLATE, SYSTEM_PROMPT, SUMMARY_MAX_TOKENS, SummaryOut),
+    "appeal": (APPEAL_TEMPLATE, SYSTEM_PROMPT, DRAFTING_MAX_TOKENS, None),
+    "review": (REVIEW_TEMPLATE, SYSTEM_PROMPT, REVIEW_MAX_TOKENS, None),
+    "review_reduce": (REVIEW_REDUCE_TEMPLATE, SYSTEM_PROMPT, REVIEW_MAX_TOKENS, None),
+    "lawsuit": (LAWSUIT_TEMPLATE, SYSTEM_PROMPT, DRAFTING_MAX_TOKENS, None),
+    "lawsuit_response": (LAWSUIT_RESPONSE_TEMPLATE, SYSTEM_PROMPT, DRAFTING_MAX_TOKENS, None),
+    "contract_analysis": (CONTRACT_ANALYSIS_TEMPLATE, SYSTEM_PROMPT, DRAFTING_MAX_TOKENS, None),
+    "chat": (CHAT_TEMPLATE, CHAT_SYSTEM_PROMPT, None, None)
+}
+
+class LegalAgentError(Exception):
+    """Raised when an agent fails to produce its result."""
+
+class LegalRateLimited(LegalAgentError):
+    """Raised when OpenAI keeps rate limiting after all retries; safe to retry later."""
+
+def agent_error(action: str, error: Exception) -> LegalAgentError:
+    """Wrap a failure from an agent in the domain exception callers handle."""
+    if isinstance(error, RateLimitError) and not is_quota_exhausted(error):
+        return LegalRateLimited(f"Rate limit reached while {action}. Please try again shortly.")
+    return LegalAgentError(f"Error {action}: {error}")
+
+def is_quota_exhausted(error: BaseException) -> bool:
+    """OpenAI also reports an exhausted quota as a 429, but waiting does not clear it."""
+    return isinstance(error, RateLimitError) and error.code == "insufficient_quota"
+
+def is_retryable(error: BaseException) -> bool:
+    return isinstance(error, RETRYABLE_ERRORS) and not is_quota_exhausted(error)
+
+def require_document(document: str):
+    """Reject empty input up front so every agent fails the same way."""
+    if not document or not document.strip():
+        raise ValueError("Cannot process an empty document")
+
+def loop_local(store: weakref.WeakKeyDictionary, factory):
+    """Value of store for the running event loop, created by factory on first use.
+
+    Entries of loops that have been closed are dropped, so callers that run
+    each request with its own asyncio.run do not accumulate them.
+    """
+    loop = asyncio.get_running_loop()
+    for stale in [other for other in store if other.is_closed()]:
+        del store[stale]
+    if loop not in store:
+        store[loop] = factory()
+    return store[loop]
+
+@functools.lru_cache(maxsize=1)
+def enable_llm_cache():
+    if LLM_CACHE_PATH:
+        set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
+# One model per event loop: its pooled async HTTP client is bound to the loop that opened it
+_models = weakref.WeakKeyDictionary()
+
+def get_model() -> ChatOpenAI:
+    """Return the chat model of the running event loop, creating it on first use.
+
+    Nothing touches the API key, the response cache or the network at import
+    time, and tests can monkeypatch this function to supply a fake model.
+    """
+    return loop_local(_models, create_model)
+
+def create_model() -> ChatOpenAI:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+    enable_llm_cache()
+
+    return ChatOpenAI(
+        model=MODEL_NAME,
+        openai_api_key=api_key,
+        temperature=0.7,
+        max_completion_tokens=2048,
+        # Backoff is handled by the chains' retry policy rather than the OpenAI client
+        max_retries=0,
+        http_client=httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=60.0),
+        http_async_client=httpx.AsyncClient(http2=True, limits=HTTP_LIMITS, timeout=60.0)
+    )
+
+async def aclose_http_clients():
+    """Close the running loop's pooled HTTP clients; call once before the loop shuts down."""
+    loop = asyncio.get_running_loop()
+    _chains.pop(loop, None)
+    model = _models.pop(loop, None)
+    if model is not None:
+        model.http_client.close()
+        await model.http_async_client.aclose()
+
+def create_prompt(template: str, system_prompt: str = SYSTEM_PROMPT) -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("human", template)
+    ])
+
+# One semaphore per event loop; Streamlit sessions all share the app's background loop
+_llm_semaphores = weakref.WeakKeyDictionary()
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """Semaphore bounding in-flight model calls on the running event loop."""
+    return loop_local(_llm_semaphores, lambda: asyncio.Semaphore(MAX_CONCURRENCY))
+
+class ConcurrencyLimit(Runnable):
+    """Runs the wrapped model step while holding a slot of the shared LLM semaphore."""
+
+    def __init__(self, bound: Runnable):
+        self.bound = bound
+
+    def invoke(self, input, config: RunnableConfig = None, **kwargs):
+        return self.bound.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input, config: RunnableConfig = None, **kwargs):
+        async with get_llm_semaphore():
+            return await self.bound.ainvoke(input, config, **kwargs)
+
+    async def astream(self, input, config: RunnableConfig = None, **kwargs):
+        async with get_llm_semaphore():
+            async for chunk in self.bound.astream(input, config, **kwargs):
+                yield chunk
+
+# Chains built on each loop's model, by chain name
+_chains = weakref.WeakKeyDictionary()
+
+def get_chain(name: str) -> RunnableSequence:
+    """Build the prompt | model pipeline for a chain once per event loop; agents only supply the inputs."""
+    chains = loop_local(_chains, dict)
+    if name not in chains:
+        chains[name] = build_chain(name)
+    return chains[name]
+
+def build_chain(name: str) -> RunnableSequence:
+    template, system_prompt, max_tokens, schema = CHAIN_SPECS[name]
+    model = get_model()
+    if max_tokens is not None:
+        # A copy rather than .bind() so the cap survives with_structured_output
+        model = model.model_copy(update={"max_tokens": max_tokens})
+    llm = model
+    if schema is not None:
+        # Truncated JSON cannot be parsed, so retry once with room for the whole object
+        llm = model.with_structured_output(schema).with_fallbacks(
+            [model.model_copy(update={"max_tokens": STRUCTURED_RETRY_MAX_TOKENS}).with_structured_output(schema)],
+            exceptions_to_handle=(LengthFinishReasonError,)
+        )
+    # Every call holds a semaphore slot, released while the retry policy backs off;
+    # only invoke/batch calls are retried here, streams are retried by astream_with_retry
+    llm = ConcurrencyLimit(llm).with_retry(
+        retry_if_exception_type=is_retryable,
+        wait_exponential_jitter=True,
+        exponential_jitter_params={"max": RETRY_MAX_WAIT},
+        stop_after_attempt=RETRY_ATTEMPTS
+    )
+    return create_prompt(template, system_prompt) | llm
+
+async def astream_with_retry(chain: RunnableSequence, inputs: dict) -> AsyncIterator:
+    """Stream a chain, retrying transient errors until its first chunk arrives.
+
+    Once output has been yielded a retry would repeat it, so later failures
+    are raised to the caller.
+    """
+    async for attempt in AsyncRetrying(
+        retry=retry_if_exception(is_retryable),
+        wait=wait_random_exponential(multiplier=1, max=RETRY_MAX_WAIT),
+        stop=stop_after_attempt(RETRY_ATTEMPTS),
+        reraise=True
+    ):
+        with attempt:
+            stream = chain.astream(inputs)
+            try:
+                first = await anext(stream)
+            except StopAsyncIteration:
+                return
+    yield first
+    async for chunk in stream:
+        yield chunk
+
+def response_value(response):
+    """Text of a chat message, or the parsed object returned by a structured chain."""
+    return response.content if isinstance(response, BaseMessage) else response
+
+@functools.lru_cache(maxsize=1)
+def get_encoding() -> tiktoken.Encoding:
+    return tiktoken.encoding_for_model(MODEL_NAME)
+
+def count_tokens(text: str) -> int:
+    return len(get_encoding().encode(text))
+
+def chunk_document(document: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP) -> list[str]:
+    """Split a document into chunks of at most max_tokens, breaking on paragraphs and sentences."""
+    splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        model_name=MODEL_NAME,
+        chunk_size=max_tokens,
+        chunk_overlap=overlap,
+        separators=["\n\n", "\n", ". ", " ", ""],
+        # Each sentence keeps its own terminator instead of passing it to the next chunk
+        keep_separator="end"
+    )
+    return splitter.split_text(document)
+
+def prepare_chunks(document: str) -> list[str]:
+    """Chunks an agent should process: the whole document when it fits in one call."""
+    if document.strip() and count_tokens(document) <= SINGLE_CALL_TOKENS:
+        return [document]
+    return chunk_document(document)
+
+def format_packed_chunks(group: list[str]) -> str:
+    if len(group) == 1:
+        return group[0]
+    marked = "\n\n".join(f"{CHUNK_MARKER.format(index=index)}\n{chunk}" for index, chunk in enumerate(group, 1))
+    return f"{PACKED_CHUNKS_INSTRUCTION}\n\n{marked}"
+
+def strip_overlap(previous: str, chunk: str) -> str:
+    """Drop the start of chunk that repeats the end of the previous chunk (the splitter's overlap)."""
+    longest = min(len(previous), len(chunk), CHUNK_OVERLAP * 10)
+    for size in range(longest, MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(chunk[:size]):
+            return chunk[size:].lstrip()
+    return chunk
+
+def pack_chunks(doc_chunks: list[str], budget: int = PACK_TOKENS, max_group: int = None) -> list[str]:
+    """Merge runs of small consecutive chunks into marked prompts of at most budget tokens.
+
+    Each call carries the full prompt template, so many tiny chunks are cheaper
+    answered together with per-chunk markers than one request each. Groups hold
+    at most max_group chunks so every answer fits in the completion cap, and
+    the overlap repeated between neighbouring chunks is sent only once.
+    """
+    packed = []
+    group = []
+    group_tokens = 0
+    for previous, chunk in zip([None] + doc_chunks, doc_chunks):
+        tokens = count_tokens(chunk)
+        if group and (group_tokens + tokens > budget or len(group) == max_group):
+            packed.append(format_packed_chunks(group))
+            group = []
+            group_tokens = 0
+        if group:
+            chunk = strip_overlap(previous, chunk)
+            # Nothing left when the whole chunk repeats the end of its predecessor
+            if not chunk.strip():
+                continue
+        group.append(chunk)
+        group_tokens += tokens
+    if group:
+        packed.append(format_packed_chunks(group))
+    return packed
+
+def unpack_response(text: str, separator: str) -> str:
+    """Join the per-chunk answers of a packed response; unmarked responses pass through."""
+    parts = CHUNK_MARKER_PATTERN.split(text)
+    if parts[0].strip() and len(parts) > 1:
+        logging.warning(f"Dropping text before the first chunk marker of a packed response: {parts[0].strip()[:200]}")
+    answers = [answer.strip() for answer in parts[2::2]]
+    return separator.join(answers) if answers else text
+
+def use_batch_api(doc_chunks: list[str], batch: bool = False) -> bool:
+    """Decide whether chunk calls should go through the discounted Batch API."""
+    return batch or (BATCH_THRESHOLD > 0 and len(doc_chunks) > BATCH_THRESHOLD)
+
+async def batch_chain(name: str, inputs: list[dict]) -> list:
+    """Submit the named chain once per input to the Batch API and return the results in order."""
+    template, system_prompt, max_tokens, schema = CHAIN_SPECS[name]
+    prompt = create_prompt(template, system_prompt)
+    batches = [prompt.format_messages(**chain_input) for chain_input in inputs]
+    model = get_model()
+    results = await run_batch(
+        batches,
+        model.model_name,
+        max_tokens or model.max_tokens,
+        model.temperature,
+        json_schema_response_format(schema) if schema else None
+    )
+    return [schema.model_validate_json(result) for result in results] if schema else results
+
+async def invoke_chain(name: str, inputs: dict, batch: bool = False):
+    """Run the named chain once, through the Batch API when batch is set."""
+    if batch:
+        results = await batch_chain(name, [inputs])
+        return results[0]
+    return response_value(await get_chain(name).ainvoke(inputs))
+
+async def invoke_chunks(name: str, doc_chunks: list[str], batch: bool = False) -> list:
+    """Run the named chain once per chunk and return the responses in chunk order.
+
+    Real-time calls keep at most MAX_CONCURRENCY requests in flight; large or
+    explicitly flagged jobs are submitted to the Batch API instead.
+    """
+    inputs = [{"document": chunk} for chunk in doc_chunks]
+    if use_batch_api(doc_chunks, batch):
+        return await batch_chain(name, inputs)
+    responses = await get_chain(name).abatch(inputs, config={"max_concurrency": MAX_CONCURRENCY})
+    return [response_value(response) for response in responses]
+
+async def join_chunk_responses(name: str, doc_chunks: list[str], batch: bool = False, separator: str = " ") -> str:
+    """Run the named text chain over the (packed) chunks and join the responses in chunk order.
+
+    Each response is written to the buffer as soon as all earlier chunks have
+    been written, so completed messages are released instead of being held
+    until the slowest chunk returns.
+    """
+    max_tokens = CHAIN_SPECS[name][2] or get_model().max_tokens
+    doc_chunks = pack_chunks(doc_chunks, max_group=max(1, max_tokens // PACKED_ANSWER_TOKENS))
+    if use_batch_api(doc_chunks, batch):
+        responses = await invoke_chunks(name, doc_chunks, batch)
+        return separator.join(unpack_response(response, separator) for response in responses)
+    if len(doc_chunks) == 1:
+        response = await get_chain(name).ainvoke({"document": doc_chunks[0]})
+        return unpack_response(response.content, separator)
+    inputs = [{"document": chunk} for chunk in doc_chunks]
+    buffer = io.StringIO()
+    pending = {}
+    next_index = 0
+    async for index, response in get_chain(name).abatch_as_completed(inputs, config={"max_concurrency": MAX_CONCURRENCY}):
+        pending[index] = unpack_response(response.content, separator)
+        while next_index in pending:
+            if next_index:
+                buffer.write(separator)
+            buffer.write(pending.pop(next_index))
+            next_index += 1
+    return buffer.getvalue()
+
+async def map_reduce_chunks(map_name: str, reduce_name: str, doc_chunks: list[str], batch: bool = False) -> str:
+    """Apply the map chain to every chunk, then consolidate the partial results in one reduce call."""
+    if len(doc_chunks) < 2:
+        return await join_chunk_responses(map_name, doc_chunks, batch)
+    partials = await join_chunk_responses(map_name, doc_chunks, batch, separator="\n\n---\n\n")
+    return await invoke_chain(reduce_name, {"document": partials}, use_batch_api(doc_chunks, batch))
+
+async def legal_summary_structured(document: str, batch: bool = False, doc_chunks: list[str] = None) -> SummaryOut:
+    """Summarize a document into a SummaryOut, merging per-chunk summaries in one reduce call."""
+    require_document(document)
+    if doc_chunks is None:
+        doc_chunks = prepare_chunks(document)
+    partials = await invoke_chunks("summary", doc_chunks, batch)
+    if len(partials) == 1:
+        return partials[0]
+    merged = "\n\n".join(partial.model_dump_json() for partial in partials)
+    return await invoke_chain("summary_reduce", {"document": merged}, use_batch_api(doc_chunks, batch))
+
+async def extract_skeleton(document: str, doc_chunks: list[str] = None, batch: bool = False) -> dict:
+    """Extract the case skeleton (parties, facts, claims, decision, relief) the drafting agents work from.
+
+    Documents that fit in the context window are read in a single call; longer
+    ones are extracted per chunk and merged. Repeated extractions of the same
+    document are answered by the LLM response cache.
+    """
+    require_document(document)
+    if doc_chunks is None:
+        doc_chunks = prepare_chunks(document)
+    if len(doc_chunks) < 2:
+        skeleton = await invoke_chain("skeleton", {"document": "".join(doc_chunks)}, use_batch_api(doc_chunks, batch))
+    else:
+        partials = await invoke_chunks("skeleton", doc_chunks, batch)
+        merged = "\n\n".join(partial.model_dump_json() for partial in partials)
+        skeleton = await invoke_chain("skeleton_reduce", {"document": merged}, use_batch_api(doc_chunks, batch))
+    return skeleton.model_dump()
+
+async def draft_from_skeleton(name: str, skeleton: dict, batch: bool = False) -> str:
+    """Draft a document with the named chain from a case skeleton instead of the full text."""
+    return await invoke_chain(name, {"skeleton": json.dumps(skeleton, ensure_ascii=False, indent=2)}, batch)
+
+async def legal_summary_agent(document: str, batch: bool = False, doc_chunks: list[str] = None) -> str:
     """Generate a document summary following Serbian legal standards."""
     try:
-        doc_chunks = chunk_document(document)
-        summaries = []
-        for chunk in doc_chunks:
-            messages = create_messages(
-                """You are an expert legal AI assistant specialized in Serbian law. Your primary task is to create SHORT, HIGH-EFFICIENCY summaries of legal documents. Every summary must be concise and focused only on the most critical information a lawyer needs to know.
-
-                CORE REQUIREMENTS:
-
-                Maximum length: 600 words total
-                Focus on actionable information
-                Prioritize only the most critical points
-                Use precise, economical language
-
-                SUMMARY STRUCTURE:
-
-                BASIC INFORMATION (2–3 lines)
-                Case/Document Number: [Number, Date, Type]
-                Parties: [Only main parties]
-                Forum: [Court/Authority]
-
-                CRITICAL OVERVIEW (30–40 words)
-                One short paragraph covering the key issue and current status.
-
-                KEY LEGAL ELEMENTS
-                Primary Legal Issue: [Most important legal question]
-                Essential Facts:
-                • [Max 3 bullet points]
-                Decisive Arguments:
-                • [Strongest argument for each side]
-                Key Evidence:
-                • [Only evidence that determines the case outcome]
-
-                OUTCOME & IMPACT (2–3 bullets)
-                • Decision/Status
-                • Urgent required action
-                • Main risk/opportunity
-
-                VITAL REFERENCES
-                • Primary legal provision
-                • Precedent (if applicable)
-
-                WRITING GUIDELINES:
-                Use short, declarative sentences
-                Include only information that affects decision-making
-                Exclude background unless essential
-                Focus on conclusions rather than explanations
-                Highlight only time-sensitive elements
-
-                Please deliver a short summary of the following document, strictly following the length and format requirements above:
-                {document}
-                
-                Always respond in English, regardless of the document language.""",
-                chunk
-            )
-
-            response = model.invoke(messages)
-            summaries.append(response.content)
-        return " ".join(summaries)
+        summary = await legal_summary_structured(document, batch, doc_chunks)
+        return summary.to_markdown()
     except Exception as e:
         logging.error(f"Error in summary agent: {e}")
-        return f"Error generating summary: {str(e)}"
+        raise agent_error("generating summary", e) from e
 
-async def legal_appeal_agent(document: str) -> str:
+async def legal_appeal_agent(document: str, batch: bool = False, doc_chunks: list[str] = None, skeleton: dict = None) -> str:
     """Generate a formal appeal based on Serbian legal standards."""
     try:
-        doc_chunks = chunk_document(document)
-        appeal_parts = []
-        for chunk in doc_chunks:
-            messages = create_messages(
-                """You are a legal assistant specialized in drafting formal appeals based on the provided legal document.
-                Analyze the document and generate an appeal following the structure below:
-
-                1. Header
-                [NAME OF COURT]
-                [JURISDICTION]
-                [Case Number]
-                [NAME OF APPELLANT], Appellant
-                vs.
-                [NAME OF RESPONDENT], Respondent
-
-                2. APPEAL / NOTICE OF APPEAL
-                [Formal notice of appeal]
-
-                3. Statement of Jurisdiction
-                [Explanation of the court’s jurisdiction]
-
-                4. Statement of Facts
-                [Factual background]
-
-                5. Issues on Appeal
-                [List of specific issues being appealed]
-
-                6. Argument
-                [Detailed arguments for each issue]
-
-                7. Conclusion
-                [Requested outcome]
-
-                8. Signature and Contact Information
-                [Signature and details]
-
-                9. Certificate of Service
-                [Proof of service]
-
-                Analyze the following document and fill in this structure:
-                {document}
-                Always respond in English, regardless of the document language.""",
-                chunk
-            )
-            response = model.invoke(messages)
-            appeal_parts.append(response.content)
-        return " ".join(appeal_parts)
+        require_document(document)
+        if skeleton is None:
+            skeleton = await extract_skeleton(document, doc_chunks, batch)
+        return await draft_from_skeleton("appeal", skeleton, batch)
     except Exception as e:
         logging.error(f"Error in appeal agent: {e}")
-        return f"Error generating appeal: {str(e)}"
+        raise agent_error("generating appeal", e) from e
 
-async def legal_review_agent(document: str) -> str:
+async def legal_review_agent(document: str, batch: bool = False, doc_chunks: list[str] = None) -> str:
     """Generate a comprehensive legal review following Serbian legal standards."""
     try:
-        doc_chunks = chunk_document(document)
-        reviews = []
-        for chunk in doc_chunks:
-            messages = create_messages(
-                """You are an expert in Serbian law, an AI legal analyst with deep knowledge of Serbian contract, commercial and civil law.
-                Where applicable, follow the guidelines below for specific document types. Create a focused legal review of the document (maximum 750 words). Your goal is to produce a concise, actionable overview that Serbian lawyers can immediately use.
-
-                SUMMARY FOR ENFORCEMENT (3–4 sentences max)
-                - Type of document, purpose, and parties
-                - Applicable law and jurisdiction
-                - Key financial or business obligations
-                - Critical compliance status
-
-                HIGH-PRIORITY ANALYSIS
-                A. Legal Compliance (Top 3 critical issues)
-                - Compliance problems with Serbian law, referencing specific statutes
-                - Missing mandatory clauses required by the Serbian Civil Code
-                - Consumer protection law issues (if applicable)
-                - EU law implications affecting validity
-
-                B. Risk Assessment (Top 3 by severity)
-                - Business/legal risks with potential impact
-                - Concerns about enforceability before Serbian courts
-                - Deviations from Serbian market practice
-                - Conflicts with recent Supreme Court precedents
-
-                ACTION PLAN (maximum 5 points)
-                - Required amendments for legal compliance
-                - Specific clause modifications needed
-                - Additional recommended provisions
-                - Steps to mitigate risks
-                - Practical guidance for implementation
-
-                REVIEW REQUIREMENTS
-                - Reference specific Serbian laws, regulations, and case law
-                - Focus on essential issues, not formatting
-                - Prioritize problems based on legal/business impact
-                - Keep the language clear and action-oriented
-                - Include business-critical EU law implications (when relevant)
-
-                FINAL SUMMARY
-                A 3-sentence conclusion highlighting the most urgent issue requiring immediate attention.
-
-                REVIEW PARAMETERS
-                - Each section must be direct and concise
-                - Focus on major legal issues, not minor technicalities
-                - Include only relevant case law references
-                - Maintain practical business context
-                - Emphasize any urgent compliance issues
-
-                Analyze the following document according to these parameters:
-                {document}
-                Always respond in English, regardless of the document language.""",
-                chunk
-            )
-            response = model.invoke(messages)
-            reviews.append(response.content)
-        return " ".join(reviews)
+        require_document(document)
+        if doc_chunks is None:
+            doc_chunks = prepare_chunks(document)
+        return await map_reduce_chunks("review", "review_reduce", doc_chunks, batch)
     except Exception as e:
         logging.error(f"Error in review agent: {e}")
-        return f"Error generating review: {str(e)}"
+        raise agent_error("generating review", e) from e
 
-async def legal_lawsuit_agent(document: str) -> str:
+async def legal_lawsuit_agent(document: str, batch: bool = False, doc_chunks: list[str] = None, skeleton: dict = None) -> str:
     """Generate a formal lawsuit based on the legal document analysis following Serbian legal standards."""
     try:
-        doc_chunks = chunk_document(document)
-        lawsuit_parts = []
-        for chunk in doc_chunks:
-            messages = create_messages(
-                """You are an AI assistant designed to help Serbian lawyers draft legal complaints and related documents.
-                Analyze the document and generate a legal complaint following the structure below:
-
-                [Name of Court]
-                [Jurisdiction]
-                [Case Number]
-
-                PLAINTIFF: [Extract from document]
-                DEFENDANT: [Extract from document]
-
-                COMPLAINT
-
-                I. INTRODUCTION
-                [Generate an introduction based on the document]
-
-                II. JURISDICTION AND VENUE
-                [Determine the proper jurisdiction]
-
-                III. PARTIES
-                [Details about the parties extracted from the document]
-
-                IV. FACTUAL ALLEGATIONS
-                [Extract and organize the facts]
-
-                V. CAUSES OF ACTION
-                [Legal grounds for the claim]
-
-                VI. DAMAGES
-                [Specify the damages]
-
-                VII. PRAYER FOR RELIEF
-                [Formulate the requested remedies]
-
-                VIII. REQUEST FOR JUDICIAL PANEL
-                [Standard request]
-
-                IX. EXHIBITS
-                [List supporting evidence]
-
-                Analyze the following document and complete the structure:
-                {document}
-                Always respond in English, regardless of the document language.""",
-                chunk
-            )
-            response = model.invoke(messages)
-            lawsuit_parts.append(response.content)
-        return " ".join(lawsuit_parts)
+        require_document(document)
+        if skeleton is None:
+            skeleton = await extract_skeleton(document, doc_chunks, batch)
+        return await draft_from_skeleton("lawsuit", skeleton, batch)
     except Exception as e:
         logging.error(f"Error in lawsuit agent: {e}")
-        return f"Error generating lawsuit: {str(e)}"
+        raise agent_error("generating lawsuit", e) from e
 
-async def legal_lawsuit_response_agent(document: str) -> str:
+async def legal_lawsuit_response_agent(document: str, batch: bool = False, doc_chunks: list[str] = None, skeleton: dict = None) -> str:
     """Generate a formal response to a lawsuit based on Serbian legal standards."""
     try:
-        doc_chunks = chunk_document(document)
-        response_parts = []
-        for chunk in doc_chunks:
-            messages = create_messages(
-                """You are an AI assistant designed to help Serbian lawyers prepare legal answers to lawsuits.
-                Analyze the document and generate an answer to the complaint using the structure below:
-
-                [Name of Court]
-                [Jurisdiction]
-                [Case Number]
-
-                Defendant: [Extract from document]
-                Address: [Defendant’s Address]
-                Phone: [Defendant’s Phone]
-                Email: [Defendant’s Email]
-
-                ANSWER TO COMPLAINT
-
-                I. INTRODUCTION
-                [Generate an introduction based on the document]
-
-                II. RESPONSE TO FACTUAL ALLEGATIONS
-                [Address each allegation made by the plaintiff individually]
-
-                III. LEGAL ARGUMENTS
-                [Legal arguments and counterarguments]
-
-                IV. EVIDENCE
-                [List and describe supporting evidence]
-
-                V. REQUEST FOR RELIEF
-                [Formulate the defendant’s requests]
-
-                VI. EXHIBITS
-                [List the exhibits]
-
-                Analyze the following document and complete the structure:
-                {document}
-                Always respond in English, regardless of the document language.""",
-                chunk
-            )
-            response = model.invoke(messages)
-            response_parts.append(response.content)
-        return " ".join(response_parts)
+        require_document(document)
+        if skeleton is None:
+            skeleton = await extract_skeleton(document, doc_chunks, batch)
+        return await draft_from_skeleton("lawsuit_response", skeleton, batch)
     except Exception as e:
         logging.error(f"Error in lawsuit response agent: {e}")
-        return f"Error generating lawsuit response: {str(e)}"
+        raise agent_error("generating lawsuit response", e) from e
 
-async def legal_contract_analysis_agent(document: str) -> str:
+async def legal_contract_analysis_agent(document: str, batch: bool = False, doc_chunks: list[str] = None) -> str:
     """Analyze legal contracts following Serbian legal standards."""
     try:
-        doc_chunks = chunk_document(document)
-        analysis_parts = []
-        for chunk in doc_chunks:
-            messages = create_messages(
-                """You are a legal contract analyst specialized in Serbian law.
-                Please analyze the following contract according to these criteria:
-
-                1. Basic Elements of the Contract:
-                   - Offer and acceptance
-                   - Consideration and intent
-                   - Capacity to contract
-                   - Compliance with the Law on Obligations (Zakon o obligacionim odnosima)
-
-                2. Key Clauses:
-                   - Identification and explanation of important provisions
-                   - Assessment of clarity and enforceability
-                   - Recommendations for improvement
-                   - Potential legal ambiguities
-
-                3. Legal Compliance:
-                   - Verification of compliance with Serbian laws
-                   - References to relevant regulations
-                   - Alignment with case law
-                   - Regulatory concerns
-
-                4. Risk Assessment:
-                   - Legal risks
-                   - Financial risks
-                   - Operational risks
-                   - Recommendations for mitigation
-
-                5. Special Provisions:
-                   - Choice of law and jurisdiction
-                   - International aspects (if any)
-                   - Sector-specific requirements
-                   - Data protection and confidentiality
-
-                6. Recommendations for Improvement:
-                   - Specific proposed amendments
-                   - Additional protective measures
-                   - Alignment with best practices
-                   - Legal optimization
-
-                Analyze the following contract:
-                {document}
-                Always respond in English, regardless of the document language.""",
-                chunk
-            )
-            response = model.invoke(messages)
-            analysis_parts.append(response.content)
-        return " ".join(analysis_parts)
+        require_document(document)
+        if doc_chunks is None:
+            doc_chunks = prepare_chunks(document)
+        return await join_chunk_responses("contract_analysis", doc_chunks, batch)
     except Exception as e:
         logging.error(f"Error in contract analysis agent: {e}")
-        return f"Error analyzing contract: {str(e)}"
+        raise agent_error("analyzing contract", e) from e
 
-async def legal_chat_helper_agent(document: str, question: str = "") -> str:
-    """Interactive chat agent for answering questions about legal documents."""
+async def legal_chat_helper_stream(document: str, question: str = "") -> AsyncIterator[str]:
+    """Stream the chat helper's answer piece by piece as the model generates it."""
     try:
-        system_message = SystemMessage(content="""
-            You are the "Legal Chat Helper Agent," designed to assist users in working with legal documents.
-            Your role is to:
-            - Guide users through document-related tasks
-            - Explain content in simple, easy-to-understand language
-            - Help interpret specific sections of documents
-            - Suggest relevant actions (summaries, appeals, reviews, etc.)
-            - Stay neutral and professional
-            - Provide accurate, helpful responses
-            
-            When responding:
-            1. First understand if the user needs:
-               - An explanation of the document
-               - Help editing or modifying the document
-               - Guidance on using other agents
-               - General legal questions
-                                       
-            2. Provide clear, structured guidance
-            3. Suggest practical next steps
-            4. Base your response strictly on the provided document
-            Always respond in English, regardless of the document language.
-        """)
-        
-        human_message = HumanMessage(content=f"""
-            Based on this legal document, please help with the following:
-            
-            User Question: {question}
-            
-            Document Content:
-            ---
-            {document}
-            ---
-            
-            Please provide a helpful and detailed response while maintaining professional legal tone.
-            Always respond in English, regardless of the document language.
-        """)
-        
-        messages = [system_message, human_message]
-        response = model.invoke(messages)
-        return response.content
+        require_document(document)
+        async for chunk in astream_with_retry(get_chain("chat"), {"question": question, "document": document}):
+            yield chunk.content
     except Exception as e:
         logging.error(f"Error in chat helper: {e}")
-        return "I apologize, but I encountered an error. Could you please rephrase your question or specify what you'd like to know about the document?"
+        raise agent_error("answering your question", e) from e
+
+async def legal_chat_helper_agent(document: str, question: str = "") -> str:
+    """Interactive chat agent for answering questions about legal documents."""
+    return "".join([part async for part in legal_chat_helper_stream(document, question)])
@@ -0,0 +1,115 @@
+import json
+import asyncio
+import logging
+from openai import AsyncOpenAI
+from pydantic import BaseModel
+from langchain_core.messages import BaseMessage, convert_to_openai_messages
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# Batch API endpoint used for every request line
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+# Statuses for which OpenAI is still working on the batch
+PENDING_STATUSES = {"validating", "in_progress", "finalizing"}
+
+def json_schema_response_format(schema: type[BaseModel]) -> dict:
+    """Strict structured-output response_format for a Pydantic schema."""
+    function = convert_to_openai_tool(schema, strict=True)["function"]
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": function["name"], "schema": function["parameters"], "strict": True}
+    }
+
+def build_batch_file(
+    messages_list: list[list[BaseMessage]],
+    model: str,
+    max_tokens: int,
+    temperature: float,
+    response_format: dict = None
+) -> bytes:
+    """Serialize one chat completion request per message list into Batch API JSONL."""
+    lines = []
+    for index, messages in enumerate(messages_list):
+        body = {
+            "model": model,
+            "messages": convert_to_openai_messages(messages),
+            "temperature": temperature,
+            "max_completion_tokens": max_tokens
+        }
+        if response_format:
+            body["response_format"] = response_format
+        lines.append(json.dumps({
+            "custom_id": str(index),
+            "method": "POST",
+            "url": CHAT_COMPLETIONS_URL,
+            "body": body
+        }, ensure_ascii=False))
+    return "\n".join(lines).encode("utf-8")
+
+async def submit_batch(
+    messages_list: list[list[BaseMessage]],
+    model: str = "gpt-4o-mini",
+    max_tokens: int = 2048,
+    temperature: float = 0.7,
+    response_format: dict = None,
+    client: AsyncOpenAI = None
+) -> str:
+    """Upload the requests and create a Batch API job, returning its id."""
+    client = client or AsyncOpenAI()
+    batch_file = await client.files.create(
+        file=("batch.jsonl", build_batch_file(messages_list, model, max_tokens, temperature, response_format)),
+        purpose="batch"
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint=CHAT_COMPLETIONS_URL,
+        completion_window="24h"
+    )
+    logging.info(f"Submitted batch {batch.id} with {len(messages_list)} requests")
+    return batch.id
+
+async def await_batch(batch_id: str, poll_interval: float = 30.0, client: AsyncOpenAI = None) -> list[str]:
+    """Poll a Batch API job until it finishes and return the completions in submission order."""
+    client = client or AsyncOpenAI()
+    batch = await client.batches.retrieve(batch_id)
+    while batch.status in PENDING_STATUSES:
+        await asyncio.sleep(poll_interval)
+        batch = await client.batches.retrieve(batch_id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+
+    output = await client.files.content(batch.output_file_id)
+    results = {}
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            raise RuntimeError(f"Batch request {record['custom_id']} failed: {record.get('error') or response.get('body')}")
+        choice = response["body"]["choices"][0]
+        message = choice["message"]
+        if message.get("content") is None:
+            raise RuntimeError(f"Batch request {record['custom_id']} returned no content (refusal: {message.get('refusal')})")
+        # A truncated answer is unusable, and for structured output it is not even valid JSON
+        if choice.get("finish_reason") == "length":
+            raise RuntimeError(f"Batch request {record['custom_id']} was cut off at its completion token limit")
+        results[int(record["custom_id"])] = message["content"]
+
+    if len(results) != batch.request_counts.total:
+        raise RuntimeError(f"Batch {batch_id} returned {len(results)} of {batch.request_counts.total} results")
+    return [results[index] for index in sorted(results)]
+
+async def run_batch(
+    messages_list: list[list[BaseMessage]],
+    model: str = "gpt-4o-mini",
+    max_tokens: int = 2048,
+    temperature: float = 0.7,
+    response_format: dict = None,
+    poll_interval: float = 30.0
+) -> list[str]:
+    """Submit a batch and wait for its results."""
+    async with AsyncOpenAI() as client:
+        batch_id = await submit_batch(messages_list, model, max_tokens, temperature, response_format, client)
+        return await await_batch(batch_id, poll_interval, client)
@@ -1,14 +1,35 @@
+import asyncio
 import logging
+from typing import AsyncIterator
 from src.agents import (
+    LegalAgentError,
+    LegalRateLimited,
+    agent_error,
+    prepare_chunks,
+    extract_skeleton,
     legal_summary_agent,
     legal_appeal_agent,
     legal_review_agent,
     legal_lawsuit_agent,
     legal_lawsuit_response_agent,
     legal_contract_analysis_agent,
-    legal_chat_helper_agent
+    legal_chat_helper_agent,
+    legal_chat_helper_stream
 )
 
+# Document agents that can share one chunked copy of the document
+DOCUMENT_AGENTS = {
+    "summary": legal_summary_agent,
+    "appeal": legal_appeal_agent,
+    "review": legal_review_agent,
+    "lawsuit": legal_lawsuit_agent,
+    "lawsuit_response": legal_lawsuit_response_agent,
+    "contract_analysis": legal_contract_analysis_agent
+}
+
+# Drafting agents that work from the shared case skeleton
+SKELETON_AGENTS = {"appeal", "lawsuit", "lawsuit_response"}
+
 class LegalDocumentProcessor:
     async def process_document(self, document: str, request_type: str, question: str = None) -> dict:
         try:
@@ -30,5 +51,50 @@ class LegalDocumentProcessor:
                 return {"error": "Invalid request type"}
 
             return {"result": result}
+        except LegalRateLimited as e:
+            return {"error": str(e), "retryable": True}
+        except LegalAgentError as e:
+            return {"error": str(e)}
         except Exception as e:
+            logging.error(f"Unexpected error processing {request_type} request: {e}")
             return {"error": str(e)}
+
+    async def stream_chat(self, document: str, question: str = None) -> AsyncIterator[str]:
+        """Stream the chat helper's answer so the UI can render it as it is generated."""
+        async for part in legal_chat_helper_stream(document, question):
+            yield part
+
+class LegalPipeline:
+    """Run several document agents on one document, splitting it and extracting its skeleton only once."""
+
+    def __init__(self, document: str):
+        self.document = document
+        self.chunks = prepare_chunks(document)
+        self.skeleton = None
+
+    async def run(self, request_types: list[str]) -> dict[str, str]:
+        """Run the requested agents concurrently and return their results keyed by request type."""
+        unknown = [request_type for request_type in request_types if request_type not in DOCUMENT_AGENTS]
+        if unknown:
+            raise ValueError(f"Invalid request type(s): {', '.join(unknown)}")
+        # The skeleton is extracted alongside the other agents; only the drafting agents wait for it
+        skeleton_task = None
+        if self.skeleton is None and SKELETON_AGENTS.intersection(request_types):
+            skeleton_task = asyncio.ensure_future(self._extract_skeleton())
+        results = await asyncio.gather(*(self._agent(request_type, skeleton_task) for request_type in request_types))
+        return dict(zip(request_types, results))
+
+    async def _extract_skeleton(self) -> dict:
+        self.skeleton = await extract_skeleton(self.document, self.chunks)
+        return self.skeleton
+
+    async def _agent(self, request_type: str, skeleton_task: asyncio.Future = None) -> str:
+        if request_type in SKELETON_AGENTS:
+            skeleton = self.skeleton
+            if skeleton_task is not None:
+                try:
+                    skeleton = await skeleton_task
+                except Exception as e:
+                    raise agent_error("extracting the case skeleton", e) from e
+            return await DOCUMENT_AGENTS[request_type](self.document, doc_chunks=self.chunks, skeleton=skeleton)
+        return await DOCUMENT_AGENTS[request_type](self.document, doc_chunks=self.chunks)
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+
+def format_bullets(items: list[str]) -> str:
+    return "\n".join(f"• {item}" for item in items)
+
+class SummaryOut(BaseModel):
+    """Structured legal document summary with the sections of the summary template."""
+
+    basic_info: str = Field(description="Case/document number, date and type, main parties and forum, in 2-3 lines")
+    overview: str = Field(description="30-40 word paragraph covering the key issue and current status")
+    primary_legal_issue: str = Field(description="Most important legal question")
+    essential_facts: list[str] = Field(description="At most 3 essential facts")
+    decisive_arguments: list[str] = Field(description="Strongest argument for each side")
+    key_evidence: list[str] = Field(description="Only evidence that determines the case outcome")
+    outcome_and_impact: list[str] = Field(description="Decision/status, urgent required action and main risk/opportunity")
+    vital_references: list[str] = Field(description="Primary legal provision and precedent, if applicable")
+
+    def to_markdown(self) -> str:
+        """Render the summary in the section layout shown to users."""
+        return "\n\n".join([
+            f"BASIC INFORMATION\n{self.basic_info}",
+            f"CRITICAL OVERVIEW\n{self.overview}",
+            "KEY LEGAL ELEMENTS\n"
+            f"Primary Legal Issue: {self.primary_legal_issue}\n"
+            f"Essential Facts:\n{format_bullets(self.essential_facts)}\n"
+            f"Decisive Arguments:\n{format_bullets(self.decisive_arguments)}\n"
+            f"Key Evidence:\n{format_bullets(self.key_evidence)}",
+            f"OUTCOME & IMPACT\n{format_bullets(self.outcome_and_impact)}",
+            f"VITAL REFERENCES\n{format_bullets(self.vital_references)}"
+        ])
+
+class CaseSkeleton(BaseModel):
+    """Compact extraction of a legal document that the drafting agents work from."""
+
+    court: str = Field(description="Court or authority handling the matter, empty if unknown")
+    case_number: str = Field(description="Case or document number, empty if unknown")
+    parties: list[str] = Field(description="Each party with its role, e.g. 'Marko Petrovic - plaintiff'")
+    party_contacts: list[str] = Field(description="Address, phone and email of each party as stated, e.g. 'Marko Petrovic - Knez Mihailova 1, Belgrade'")
+    dates: list[str] = Field(description="Key dates with what happened on each")
+    facts: list[str] = Field(description="Material facts of the case")
+    evidence: list[str] = Field(description="Evidence and exhibits relied on, with what each proves")
+    claims: list[str] = Field(description="Claims, demands and defenses raised by each party")
+    legal_basis: list[str] = Field(description="Statutes, provisions and precedents invoked")
+    decision: str = Field(description="Operative part of the decision being appealed or answered, empty if none")
+    reasoning: str = Field(description="Key reasoning given for that decision, empty if none")
+    relief_sought: list[str] = Field(description="Remedies requested by each party")
@@ -0,0 +1,162 @@
+import asyncio
+import http.server
+import json
+import threading
+import httpx
+import pytest
+from langchain_openai import ChatOpenAI
+from src import agents
+from src.agents import LegalAgentError, LegalRateLimited
+from src.document_processor import DOCUMENT_AGENTS
+
+def completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": agents.MODEL_NAME,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    }
+
+def stream(content: str) -> str:
+    chunk = {
+        "id": "chatcmpl-test",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": agents.MODEL_NAME,
+        "choices": [{"index": 0, "delta": {"role": "assistant", "content": content}, "finish_reason": None}]
+    }
+    return f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
+
+def error(status_code: int, message: str, code: str = None) -> httpx.Response:
+    return httpx.Response(status_code, json={"error": {"message": message, "type": "test_error", "code": code}})
+
+@pytest.fixture
+def use_transport(monkeypatch):
+    """Route the shared model through an httpx.MockTransport serving the given handler."""
+    # Token counting would download the tiktoken encoding; word counts are enough here
+    monkeypatch.setattr(agents, "count_tokens", lambda text: len(text.split()))
+    monkeypatch.setattr(agents, "RETRY_ATTEMPTS", 3)
+    monkeypatch.setattr(agents, "RETRY_MAX_WAIT", 0)
+
+    def install(handler):
+        transport = httpx.MockTransport(handler)
+        model = ChatOpenAI(
+            model=agents.MODEL_NAME,
+            api_key="test-key",
+            max_retries=0,
+            http_client=httpx.Client(transport=transport),
+            http_async_client=httpx.AsyncClient(transport=transport)
+        )
+        monkeypatch.setattr(agents, "get_model", lambda: model)
+
+    return install
+
+def test_persistent_rate_limit_raises_legal_rate_limited(use_transport):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return error(429, "Rate limit reached")
+
+    use_transport(handler)
+    with pytest.raises(LegalRateLimited):
+        asyncio.run(agents.legal_contract_analysis_agent("A short contract."))
+    assert len(requests) == agents.RETRY_ATTEMPTS
+
+def test_rate_limit_is_retried(use_transport):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return error(429, "Rate limit reached")
+        return httpx.Response(200, json=completion("Contract analysis"))
+
+    use_transport(handler)
+    assert asyncio.run(agents.legal_contract_analysis_agent("A short contract.")) == "Contract analysis"
+    assert len(requests) == 2
+
+def test_exhausted_quota_is_not_retried(use_transport):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return error(429, "You exceeded your current quota", "insufficient_quota")
+
+    use_transport(handler)
+    with pytest.raises(LegalAgentError) as excinfo:
+        asyncio.run(agents.legal_contract_analysis_agent("A short contract."))
+    assert not isinstance(excinfo.value, LegalRateLimited)
+    assert len(requests) == 1
+
+def test_other_failures_raise_legal_agent_error(use_transport):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return error(400, "Invalid request")
+
+    use_transport(handler)
+    with pytest.raises(LegalAgentError) as excinfo:
+        asyncio.run(agents.legal_review_agent("A short contract."))
+    assert not isinstance(excinfo.value, LegalRateLimited)
+    assert len(requests) == 1
+
+def test_chat_stream_retries_until_first_chunk(use_transport):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return error(429, "Rate limit reached")
+        return httpx.Response(200, text=stream("Answer"), headers={"content-type": "text/event-stream"})
+
+    use_transport(handler)
+    assert asyncio.run(agents.legal_chat_helper_agent("A short contract.", "Who are the parties?")) == "Answer"
+    assert len(requests) == 2
+
+@pytest.mark.parametrize("request_type", sorted(DOCUMENT_AGENTS))
+def test_empty_document_raises_legal_agent_error(use_transport, request_type):
+    def handler(request):
+        raise AssertionError("No request should be sent for an empty document")
+
+    use_transport(handler)
+    with pytest.raises(LegalAgentError, match="empty document"):
+        asyncio.run(DOCUMENT_AGENTS[request_type]("   "))
+
+class CompletionHandler(http.server.BaseHTTPRequestHandler):
+    """Answers every chat completion request with "ok" over a keep-alive connection."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps(completion("ok")).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def completion_server(monkeypatch):
+    """Local OpenAI-compatible server the real get_model connects to."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), CompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(agents, "LLM_CACHE_PATH", "")
+    monkeypatch.setattr(agents, "count_tokens", lambda text: len(text.split()))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_agent_runs_on_successive_event_loops(completion_server):
+    # Each asyncio.run closes its loop; pooled connections from the first must not be reused
+    for _ in range(2):
+        assert asyncio.run(agents.legal_contract_analysis_agent("A short contract.")) == "ok"
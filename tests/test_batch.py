@@ -0,0 +1,80 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.batch import build_batch_file, submit_batch, await_batch, json_schema_response_format
+from src.schemas import SummaryOut
+
+def result_line(custom_id: str, content: str = "ok", finish_reason: str = "stop", status_code: int = 200, refusal: str = None) -> str:
+    message = {"role": "assistant", "content": content, "refusal": refusal}
+    body = {"choices": [{"index": 0, "message": message, "finish_reason": finish_reason}]}
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": status_code, "body": body}, "error": None})
+
+class FakeClient:
+    """Stands in for AsyncOpenAI: records the uploaded file and serves canned batch results."""
+
+    def __init__(self, lines: list[str], statuses: list[str] = None, total: int = None):
+        self.uploaded = None
+        self.statuses = list(statuses or ["completed"])
+        self.lines = lines
+        self.total = len(lines) if total is None else total
+        self.files = SimpleNamespace(create=self.create_file, content=self.file_content)
+        self.batches = SimpleNamespace(create=self.create_batch, retrieve=self.retrieve_batch)
+
+    async def create_file(self, file, purpose):
+        self.uploaded = file[1]
+        return SimpleNamespace(id="file-input")
+
+    async def create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id="batch-1")
+
+    async def retrieve_batch(self, batch_id):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return SimpleNamespace(status=status, output_file_id="file-output", request_counts=SimpleNamespace(total=self.total))
+
+    async def file_content(self, file_id):
+        return SimpleNamespace(text="\n".join(self.lines))
+
+def test_build_batch_file_writes_one_request_per_message_list():
+    messages = [[SystemMessage("system"), HumanMessage(f"chunk {index}")] for index in range(2)]
+    response_format = json_schema_response_format(SummaryOut)
+    lines = [json.loads(line) for line in build_batch_file(messages, "gpt-4o-mini", 900, 0.7, response_format).decode().splitlines()]
+    assert [line["custom_id"] for line in lines] == ["0", "1"]
+    assert all(line["method"] == "POST" and line["url"] == "/v1/chat/completions" for line in lines)
+    body = lines[1]["body"]
+    assert body["max_completion_tokens"] == 900
+    assert body["response_format"] == response_format
+    assert body["messages"] == [{"role": "system", "content": "system"}, {"role": "user", "content": "chunk 1"}]
+
+def test_build_batch_file_omits_response_format_for_text():
+    line = json.loads(build_batch_file([[HumanMessage("chunk")]], "gpt-4o-mini", 900, 0.7).decode())
+    assert "response_format" not in line["body"]
+
+def test_submit_batch_uploads_the_requests():
+    client = FakeClient([])
+    assert asyncio.run(submit_batch([[HumanMessage("chunk")]], client=client)) == "batch-1"
+    assert json.loads(client.uploaded)["body"]["messages"] == [{"role": "user", "content": "chunk"}]
+
+def test_await_batch_polls_and_orders_results_by_custom_id():
+    client = FakeClient([result_line("2", "c"), result_line("0", "a"), "", result_line("1", "b")], ["validating", "in_progress", "completed"], total=3)
+    assert asyncio.run(await_batch("batch-1", poll_interval=0, client=client)) == ["a", "b", "c"]
+
+def test_await_batch_raises_when_the_batch_fails():
+    client = FakeClient([], ["failed"])
+    with pytest.raises(RuntimeError, match="status 'failed'"):
+        asyncio.run(await_batch("batch-1", poll_interval=0, client=client))
+
+@pytest.mark.parametrize("line, message", [
+    (result_line("0", status_code=500), "failed"),
+    (result_line("0", content=None, refusal="I can't help with that."), "I can't help with that."),
+    (result_line("0", content='{"basic_info": "trunc', finish_reason="length"), "completion token limit")
+])
+def test_await_batch_rejects_unusable_results(line, message):
+    with pytest.raises(RuntimeError, match=message):
+        asyncio.run(await_batch("batch-1", poll_interval=0, client=FakeClient([line])))
+
+def test_await_batch_detects_missing_results():
+    client = FakeClient([result_line("0")], total=2)
+    with pytest.raises(RuntimeError, match="returned 1 of 2 results"):
+        asyncio.run(await_batch("batch-1", poll_interval=0, client=client))
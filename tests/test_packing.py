@@ -0,0 +1,61 @@
+import logging
+import pytest
+from src import agents
+from src.agents import pack_chunks, strip_overlap, unpack_response
+
+OVERLAP = "the tenant shall pay the rent on the first day of each month."
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    # Token counting would download the tiktoken encoding; word counts are enough here
+    monkeypatch.setattr(agents, "count_tokens", lambda text: len(text.split()))
+
+def answer(count: int) -> str:
+    return "\n".join(f"=== CHUNK {index} ===\nAnswer {index}" for index in range(1, count + 1))
+
+def test_packed_markers_round_trip():
+    packed = pack_chunks(["First chunk.", "Second chunk.", "Third chunk."])
+    assert len(packed) == 1
+    assert packed[0].startswith(agents.PACKED_CHUNKS_INSTRUCTION)
+    for index, chunk in enumerate(["First chunk.", "Second chunk.", "Third chunk."], 1):
+        assert f"=== CHUNK {index} ===\n{chunk}" in packed[0]
+    assert unpack_response(answer(3), " | ") == "Answer 1 | Answer 2 | Answer 3"
+
+def test_single_chunk_is_sent_unmarked():
+    assert pack_chunks(["Only chunk."]) == ["Only chunk."]
+
+def test_unmarked_response_passes_through():
+    assert unpack_response("A plain answer.", " | ") == "A plain answer."
+
+def test_text_before_first_marker_is_logged(caplog):
+    with caplog.at_level(logging.WARNING):
+        assert unpack_response("Here are the answers:\n" + answer(2), " | ") == "Answer 1 | Answer 2"
+    assert "Here are the answers:" in caplog.text
+
+def test_group_size_is_bounded_by_max_group():
+    packed = pack_chunks([f"Chunk {index}." for index in range(5)], max_group=2)
+    assert len(packed) == 3
+    assert "=== CHUNK 2 ===" in packed[0] and "=== CHUNK 3 ===" not in packed[0]
+    assert packed[2] == "Chunk 4."
+
+def test_group_size_is_bounded_by_token_budget():
+    packed = pack_chunks(["one two three", "four five six", "seven eight"], budget=6)
+    assert len(packed) == 2
+    assert packed[1] == "seven eight"
+
+def test_overlap_is_sent_once():
+    first = "Article 1. " + OVERLAP
+    second = OVERLAP + " Article 2. Late payment accrues statutory interest."
+    packed = pack_chunks([first, second])
+    assert len(packed) == 1
+    assert packed[0].count(OVERLAP) == 1
+    assert "=== CHUNK 2 ===\nArticle 2." in packed[0]
+
+def test_chunk_contained_in_previous_is_skipped():
+    first = "Article 1. " + OVERLAP
+    packed = pack_chunks([first, OVERLAP, "Article 2."])
+    assert "=== CHUNK 3 ===" not in packed[0]
+    assert "=== CHUNK 2 ===\nArticle 2." in packed[0]
+
+def test_short_coincidental_match_is_not_stripped():
+    assert strip_overlap("Signed in Belgrade.", "Belgrade. Witnesses follow.") == "Belgrade. Witnesses follow."